@@ -0,0 +1,110 @@
+"""Reports render time vs. payload size for each compression mode.
+
+Run from the root of the repo:
+    $ python -m benchmarks.compression_benchmark
+"""
+# pylint: disable=C0103
+import argparse
+from datetime import datetime
+import gzip
+import os
+import tempfile
+import time
+
+
+from src.reading_plan.plans import BookReadingPlan
+from src.reading_plan.writers import (BookReadingPlanWriter,
+                                      XLSX_COMPRESSION_MODES)
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+# (name, start date, end date, start page, end page, frequency)
+TYPICAL_PLANS = [('3 months', '20200101', '20200331', 1, 300, 5),
+                 ('1 year', '20200101', '20201231', 1, 1200, 5),
+                 ('3 years', '20200101', '20221231', 1, 3000, 7)]
+GZIP_LEVELS = [1, 6, 9]
+BROTLI_QUALITIES = [1, 5, 11]
+
+
+def time_call(func, repeat: int):
+    """Calls func repeatedly.
+
+    Returns:
+        The fastest duration in milliseconds and the last result of func.
+    """
+    # Warm up, so that the first mode benchmarked is not penalized.
+    func()
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        durations.append((time.perf_counter() - start) * 1000)
+    return min(durations), result
+
+
+def benchmark_plan(plan: BookReadingPlan, outdir: str, repeat: int):
+    """Prints the render time and payload size of a plan for each mode."""
+    writer = BookReadingPlanWriter(plan)
+    # The xlsx modes only differ in how the workbook is zipped, which is a
+    # small part of rendering, so they are timed in turns to keep changes in
+    # machine load from favoring one mode.
+    durations = {mode: [] for mode in XLSX_COMPRESSION_MODES}
+    outfiles = {}
+    for _ in range(repeat):
+        for mode in XLSX_COMPRESSION_MODES:
+            duration, outfiles[mode] = time_call(
+                lambda: writer.write_excel(outdir, compression=mode,
+                                           unique_outfile=True), 1)
+            durations[mode].append(duration)
+    for mode in XLSX_COMPRESSION_MODES:
+        print('  xlsx %-12s %8.2f ms %9d bytes' % (
+            mode, min(durations[mode]), os.path.getsize(outfiles[mode])))
+    for outfile in os.listdir(outdir):
+        os.remove(os.path.join(outdir, outfile))
+
+    duration, outfile = time_call(lambda: writer.write_csv(outdir), repeat)
+    with open(outfile, 'rb') as f:
+        data = f.read()
+    os.remove(outfile)
+    print('  csv  %-12s %8.2f ms %9d bytes' % ('identity', duration, len(data)))
+    for level in GZIP_LEVELS:
+        compress_duration, compressed = time_call(
+            lambda: gzip.compress(data, compresslevel=level), repeat)
+        print('  csv  %-12s %8.2f ms %9d bytes' % (
+            'gzip-%d' % level, duration + compress_duration, len(compressed)))
+    if brotli:
+        for quality in BROTLI_QUALITIES:
+            compress_duration, compressed = time_call(
+                lambda: brotli.compress(data, quality=quality), repeat)
+            print('  csv  %-12s %8.2f ms %9d bytes' % (
+                'br-%d' % quality, duration + compress_duration,
+                len(compressed)))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(add_help=True)
+    parser.add_argument('--repeat', type=int, default=5)
+    (options, args) = parser.parse_known_args()
+
+    if not brotli:
+        print('WARNING: brotli is not installed, so brotli will not be ' +
+              'benchmarked.')
+    with tempfile.TemporaryDirectory() as outdir:
+        for name, start_date, end_date, start_page, end_page, frequency in \
+                TYPICAL_PLANS:
+            print('%s (%d pages, %d days per week):' % (
+                name, end_page - start_page + 1, frequency))
+            book_reading_plan = BookReadingPlan(
+                start_date=datetime.strptime(start_date, '%Y%m%d'),
+                end_date=datetime.strptime(end_date, '%Y%m%d'),
+                start_page=start_page,
+                end_page=end_page,
+                num_times_to_read=frequency,
+                name=name,
+                # As rendered by /generateReadingPlan.
+                materialize_weeks=False)
+            benchmark_plan(book_reading_plan, outdir, options.repeat)
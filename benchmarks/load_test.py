@@ -0,0 +1,259 @@
+"""Load tests the web app under gunicorn, the server App Engine runs it with.
+
+Replays a random mix of /generateReadingPlan requests at increasing levels of
+concurrency and reports throughput, latency percentiles, error rates and the
+peak RSS of each gunicorn worker.  Workers are restarted between stages, so
+each stage's peak RSS is its own.  Results are saved as JSON so that runs can
+be compared before and after a change.
+
+Requires gunicorn and Linux (peak RSS is read from /procfs).  Run from the root
+of the repo:
+    $ python -m benchmarks.load_test --output before.json
+    $ python -m benchmarks.load_test --output after.json --baseline before.json
+"""
+# pylint: disable=C0103
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import glob
+import json
+import os
+import random
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List
+import urllib.error
+import urllib.parse
+import urllib.request
+
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'src')
+PLAN_START_DATE = datetime(2020, 1, 1)
+SERVER_START_TIMEOUT = 30
+
+
+def parse_ints(values: str) -> List[int]:
+    return [int(value) for value in values.split(',')]
+
+
+def start_server(port: int, workers: int, threads: int) -> subprocess.Popen:
+    """Starts gunicorn and waits until it accepts connections."""
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '--chdir', SRC_DIR,
+         '--bind', '127.0.0.1:%d' % port, '--workers', str(workers),
+         '--threads', str(threads), '--log-level', 'warning', 'main:app'])
+    deadline = time.time() + SERVER_START_TIMEOUT
+    while time.time() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError('gunicorn exited with code %d.' %
+                               server.returncode)
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return server
+        except OSError:
+            time.sleep(.1)
+    server.terminate()
+    raise RuntimeError('gunicorn did not start within %d seconds.' %
+                       SERVER_START_TIMEOUT)
+
+
+def restart_workers(server: subprocess.Popen, workers: int):
+    """Gracefully restarts the gunicorn workers and waits for the new ones."""
+    old_pids = set(get_worker_pids(server.pid))
+    os.kill(server.pid, signal.SIGHUP)
+    deadline = time.time() + SERVER_START_TIMEOUT
+    while time.time() < deadline:
+        pids = set(get_worker_pids(server.pid))
+        if len(pids) == workers and not pids & old_pids:
+            return
+        time.sleep(.1)
+    raise RuntimeError('gunicorn workers did not restart within %d seconds.' %
+                       SERVER_START_TIMEOUT)
+
+
+def get_worker_pids(server_pid: int) -> List[int]:
+    pids = []
+    for stat_path in glob.glob('/proc/[0-9]*/stat'):
+        try:
+            with open(stat_path) as f:
+                # The process name may contain spaces, so split after it.
+                ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        if ppid == server_pid:
+            pids.append(int(stat_path.split('/')[2]))
+    return sorted(pids)
+
+
+def get_peak_rss_kb(pid: int) -> int:
+    """The peak resident set size of a process (VmHWM), in kilobytes."""
+    try:
+        with open('/proc/%d/status' % pid) as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def count_tmp_files() -> int:
+    return len(glob.glob('/tmp/reading-plan*'))
+
+
+def make_request(rng: random.Random, options: Any) -> Dict[str, str]:
+    """Picks a random /generateReadingPlan form from the request mix."""
+    plan_days = rng.choice(options.plan_days)
+    num_pages = rng.choice(options.page_counts)
+    end_date = PLAN_START_DATE + timedelta(days=plan_days - 1)
+    form = {'start_date': PLAN_START_DATE.strftime('%m/%d/%Y'),
+            'end_date': end_date.strftime('%m/%d/%Y'),
+            'start_page': '1',
+            'end_page': str(num_pages),
+            'frequency': '%d days per week' % rng.randint(1, 7),
+            'book_name': 'Load Test',
+            'output_file_type': rng.choice(options.output_types)}
+    if rng.random() < .5:
+        form['format_outfile'] = 'on'
+    return form
+
+
+def send_request(url: str, form: Dict[str, str]):
+    """Posts a form.
+
+    Returns:
+        The latency in milliseconds and whether the request succeeded.
+    """
+    data = urllib.parse.urlencode(form).encode()
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(url, data=data, timeout=60) as response:
+            response.read()
+            # Errors are rendered as HTML pages.
+            ok = not response.headers.get_content_type().startswith('text/html')
+    except (urllib.error.URLError, OSError):
+        ok = False
+    return (time.perf_counter() - start) * 1000, ok
+
+
+def run_stage(url: str, concurrency: int, duration: float, seed: int,
+              options: Any) -> Dict[str, Any]:
+    """Sends requests from concurrency clients for duration seconds."""
+    deadline = time.time() + duration
+
+    def client(client_number: int):
+        rng = random.Random(seed * 1000 + client_number)
+        results = []
+        while time.time() < deadline:
+            results.append(send_request(url, make_request(rng, options)))
+        return results
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = [result
+                   for client_results in executor.map(client,
+                                                      range(concurrency))
+                   for result in client_results]
+    elapsed = time.perf_counter() - start
+    latencies = sorted(latency for latency, _ in results)
+    errors = sum(1 for _, ok in results if not ok)
+    return {'concurrency': concurrency,
+            'requests': len(results),
+            'throughput_rps': len(results) / elapsed,
+            'error_rate': errors / len(results) if results else 0,
+            'p50_ms': percentile(latencies, 50),
+            'p95_ms': percentile(latencies, 95),
+            'p99_ms': percentile(latencies, 99)}
+
+
+def percentile(sorted_values: List[float], percent: float) -> float:
+    if not sorted_values:
+        return None
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    return statistics.quantiles(sorted_values, n=100,
+                                method='inclusive')[percent - 1]
+
+
+def print_stage(stage: Dict[str, Any], baseline_stage: Dict[str, Any] = None):
+    line = ('c=%-4d %6d req %8.1f req/s  p50 %8.1f ms  p95 %8.1f ms  '
+            'p99 %8.1f ms  errors %5.1f%%  peak RSS %s KB' % (
+                stage['concurrency'], stage['requests'],
+                stage['throughput_rps'], stage['p50_ms'], stage['p95_ms'],
+                stage['p99_ms'], stage['error_rate'] * 100,
+                '/'.join(str(rss) for rss in stage['peak_rss_kb'])))
+    print(line)
+    if baseline_stage:
+        print('       vs. baseline: %+.1f%% req/s  %+.1f%% p50  %+.1f%% p95  '
+              '%+.1f%% p99' % tuple(
+                  percent_change(baseline_stage[key], stage[key])
+                  for key in ['throughput_rps', 'p50_ms', 'p95_ms',
+                              'p99_ms']))
+
+
+def percent_change(before: float, after: float) -> float:
+    return (after - before) / before * 100 if before else 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(add_help=True)
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--workers', type=int, default=1,
+                        help='gunicorn workers (an F2 instance runs 1).')
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--concurrency', type=parse_ints, default='1,2,4,8,16',
+                        help='Comma-separated number of clients per stage.')
+    parser.add_argument('--duration', type=float, default=10,
+                        help='Seconds per stage.')
+    parser.add_argument('--output-types', type=lambda v: v.split(','),
+                        default='Excel (recommended),CSV')
+    parser.add_argument('--plan-days', type=parse_ints, default='30,365,1095')
+    parser.add_argument('--page-counts', type=parse_ints,
+                        default='100,1000,5000')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='load_test_results.json')
+    parser.add_argument('--baseline', default=None,
+                        help='A previous --output file to compare against.')
+    (options, args) = parser.parse_known_args()
+
+    baseline = {}
+    if options.baseline:
+        with open(options.baseline) as f:
+            baseline = {stage['concurrency']: stage
+                        for stage in json.load(f)['stages']}
+
+    tmp_files_before = count_tmp_files()
+    server = start_server(options.port, options.workers, options.threads)
+    url = 'http://127.0.0.1:%d/generateReadingPlan' % options.port
+    stages = []
+    try:
+        for stage_number, concurrency in enumerate(options.concurrency):
+            if stage_number:
+                restart_workers(server, options.workers)
+            stage = run_stage(url, concurrency, options.duration,
+                              options.seed + stage_number, options)
+            stage['peak_rss_kb'] = [get_peak_rss_kb(pid) for pid in
+                                    get_worker_pids(server.pid)]
+            print_stage(stage, baseline.get(concurrency))
+            stages.append(stage)
+    finally:
+        server.terminate()
+        server.wait()
+
+    leftover_tmp_files = count_tmp_files() - tmp_files_before
+    if leftover_tmp_files:
+        print('WARNING: %d reading plan files were left in /tmp.' %
+              leftover_tmp_files)
+    results = {'created': datetime.now().isoformat(),
+               'options': {key: value for key, value in vars(options).items()
+                           if key not in ['output', 'baseline']},
+               'leftover_tmp_files': leftover_tmp_files,
+               'stages': stages}
+    with open(options.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print('Results were saved to %s.' % options.output)
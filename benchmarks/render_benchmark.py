@@ -0,0 +1,85 @@
+"""Reports the render time and peak memory of plans with lazily generated weeks.
+
+/generateReadingPlan and the CLI build plans with materialize_weeks=False, so
+weeks are streamed from the calendar to the writer.  Each plan is also rendered
+with materialized weeks for comparison.
+
+Run from the root of the repo:
+    $ python -m benchmarks.render_benchmark
+"""
+# pylint: disable=C0103
+import argparse
+from datetime import datetime
+import os
+import tempfile
+import time
+import tracemalloc
+
+
+from src.reading_plan.plans import BookReadingPlan
+from src.reading_plan.writers import BookReadingPlanWriter
+
+
+# (name, start date, end date, start page, end page, frequency)
+TYPICAL_PLANS = [('3 months', '20200101', '20200331', 1, 300, 5),
+                 ('3 years', '20200101', '20221231', 1, 3000, 7),
+                 ('19 years', '20200101', '20381231', 1, 20000, 5)]
+
+
+def render(plan_args: tuple, materialize_weeks: bool, file_type: str,
+           format_outfile: bool, outdir: str):
+    """Builds a plan and writes it, as /generateReadingPlan does."""
+    name, start_date, end_date, start_page, end_page, frequency = plan_args
+    plan = BookReadingPlan(start_date=datetime.strptime(start_date, '%Y%m%d'),
+                           end_date=datetime.strptime(end_date, '%Y%m%d'),
+                           start_page=start_page,
+                           end_page=end_page,
+                           num_times_to_read=frequency,
+                           name=name,
+                           materialize_weeks=materialize_weeks)
+    write = getattr(BookReadingPlanWriter(plan), 'write_' + file_type)
+    os.remove(write(outdir, format_outfile=format_outfile,
+                    unique_outfile=True))
+
+
+def time_render(repeat: int, *render_args) -> float:
+    """The fastest of repeat renders (after a warm up), in milliseconds."""
+    render(*render_args)
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        render(*render_args)
+        durations.append((time.perf_counter() - start) * 1000)
+    return min(durations)
+
+
+def peak_memory_kb(*render_args) -> float:
+    """The peak memory allocated by python during a render, in kilobytes."""
+    tracemalloc.start()
+    try:
+        render(*render_args)
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(add_help=True)
+    parser.add_argument('--repeat', type=int, default=5)
+    (options, args) = parser.parse_known_args()
+
+    with tempfile.TemporaryDirectory() as outdir:
+        for plan_args in TYPICAL_PLANS:
+            print('%s (%d pages, %d days per week):' % (
+                plan_args[0], plan_args[4] - plan_args[3] + 1, plan_args[5]))
+            for file_type in ['csv', 'excel']:
+                for format_outfile in [False, True]:
+                    for materialize_weeks in [False, True]:
+                        render_args = (plan_args, materialize_weeks,
+                                       file_type, format_outfile, outdir)
+                        print('  %-5s %-11s %-12s %8.2f ms %9.0f KB peak' % (
+                            file_type,
+                            'formatted' if format_outfile else 'unformatted',
+                            'materialized' if materialize_weeks else 'streamed',
+                            time_render(options.repeat, *render_args),
+                            peak_memory_kb(*render_args)))
@@ -1,14 +1,26 @@
 # python native libs
 from typing import Any
-from reading_plan.writers import BookReadingPlanWriter, OUT_FILENAME
-from reading_plan.plans import BookReadingPlan
+from reading_plan.common import parse_dates, parse_weekdays
+from reading_plan.writers import (BookReadingPlanWriter, OUT_FILENAME,
+                                  XLSX_COMPRESSION_MODES)
+from reading_plan.plans import (BookReadingPlan, DailyReading,
+                                 get_reading_for_date,
+                                 get_readings_for_date_range)
 from datetime import datetime
 import os
 import sys
 import io
+import gzip
 
 # flask libs
-from flask import Flask, render_template, send_file, request, abort
+from flask import (Flask, render_template, send_file, request, abort,
+                   jsonify)
+
+# optional libs
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
 # custom libs
 dirname = os.path.dirname(os.path.abspath(__file__))
@@ -17,6 +29,15 @@ sys.path.append(os.path.join(dirname, 'reading_plan'))
 # globals
 NUMBER = 0
 OUTDIR = '/tmp'  # https://cloud.google.com/appengine/docs/standard/python3/using-temp-files
+# See reading_plan.writers.XLSX_COMPRESSION_MODES.
+XLSX_COMPRESSION = os.environ.get('XLSX_COMPRESSION', 'default')
+if XLSX_COMPRESSION not in XLSX_COMPRESSION_MODES:
+    raise ValueError('XLSX_COMPRESSION must be one of: %s' %
+                     ', '.join(XLSX_COMPRESSION_MODES))
+GZIP_LEVEL = int(os.environ.get('GZIP_LEVEL', 6))
+BROTLI_QUALITY = int(os.environ.get('BROTLI_QUALITY', 5))
+# The most days from a plan's start date to its end date.
+MAX_PLAN_DAYS = int(os.environ.get('MAX_PLAN_DAYS', 365 * 19))
 
 app = Flask(__name__)
 
@@ -41,33 +62,85 @@ def generate_reading_plan():
         end_page = int(request.form['end_page'])
         frequency = int(request.form['frequency'][NUMBER])
         book_name = request.form['book_name']
+        reading_weekdays, blackout_dates = parse_calendar_args(request.form)
         book_reading_plan = BookReadingPlan(start_date=start_date,
                                             end_date=end_date,
                                             start_page=start_page,
                                             end_page=end_page,
                                             num_times_to_read=frequency,
-                                            name=book_name)
+                                            name=book_name,
+                                            reading_weekdays=reading_weekdays,
+                                            blackout_dates=blackout_dates,
+                                            max_days=MAX_PLAN_DAYS,
+                                            materialize_weeks=False)
         output_file_type = request.form['output_file_type'].lower()
         format_outfile = 'format_outfile' in request.form
         writer = BookReadingPlanWriter(book_reading_plan)
+        content_encoding = None
         if 'csv' in output_file_type:
             mimetype = 'text/csv'
             outfile_path = writer.write_csv(
                 OUTDIR, format_outfile=format_outfile)
+            content_encoding = request.accept_encodings.best_match(
+                ['br', 'gzip'] if brotli else ['gzip'])
         elif 'excel' in output_file_type:
             mimetype = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
             outfile_path = writer.write_excel(
-                OUTDIR, format_outfile=format_outfile)
+                OUTDIR, format_outfile=format_outfile,
+                compression=XLSX_COMPRESSION)
         mem_outfile = disk_to_memory(outfile_path)
-        return send_file(mem_outfile,
-                         mimetype=mimetype,
-                         attachment_filename='%s%s' % (
-                             OUT_FILENAME, os.path.splitext(outfile_path)[1]),
-                         as_attachment=True)
+        if content_encoding:
+            mem_outfile = compress(mem_outfile, content_encoding)
+        response = send_file(mem_outfile,
+                             mimetype=mimetype,
+                             attachment_filename='%s%s' % (
+                                 OUT_FILENAME,
+                                 os.path.splitext(outfile_path)[1]),
+                             as_attachment=True)
+        if content_encoding:
+            response.headers['Content-Encoding'] = content_encoding
+        response.vary.add('Accept-Encoding')
+        return response
     except Exception as e:
         abort(400, e)
 
 
+@app.route('/readingForDate', methods=['GET'])
+def reading_for_date():
+    try:
+        date = datetime.strptime(request.args['date'], '%m/%d/%Y')
+        plan_args = [datetime.strptime(request.args['start_date'], '%m/%d/%Y'),
+                     datetime.strptime(request.args['end_date'], '%m/%d/%Y'),
+                     int(request.args['start_page']),
+                     int(request.args['end_page']),
+                     int(request.args['frequency']),
+                     *parse_calendar_args(request.args)]
+        if 'days' in request.args:
+            readings = get_readings_for_date_range(
+                date, int(request.args['days']), *plan_args)
+            return jsonify([reading_to_dict(r) for r in readings])
+        return jsonify(reading_to_dict(get_reading_for_date(date, *plan_args)))
+    except Exception as e:
+        # This endpoint is consumed by services, so errors are JSON rather than
+        # the HTML error page.
+        return jsonify({'error': str(e)}), 400
+
+
+def parse_calendar_args(args: Any):
+    reading_weekdays = (parse_weekdays(args['reading_weekdays'])
+                        if args.get('reading_weekdays') else None)
+    blackout_dates = parse_dates(args.get('blackout_dates', ''), '%m/%d/%Y')
+    return reading_weekdays, blackout_dates
+
+
+def reading_to_dict(reading: DailyReading):
+    return {'date': reading.start_date.strftime('%m/%d/%Y'),
+            'start_page': reading.start_page,
+            'end_page': reading.end_page,
+            'week_number': reading.week_number,
+            'pages_remaining': reading.pages_remaining}
+
+
 def disk_to_memory(disk_path: str):
     mem_file = io.BytesIO()
     with open(disk_path, 'rb') as f:
@@ -77,5 +150,13 @@ def disk_to_memory(disk_path: str):
     return mem_file
 
 
+def compress(mem_file: io.BytesIO, content_encoding: str):
+    if content_encoding == 'br':
+        data = brotli.compress(mem_file.getvalue(), quality=BROTLI_QUALITY)
+    else:
+        data = gzip.compress(mem_file.getvalue(), compresslevel=GZIP_LEVEL)
+    return io.BytesIO(data)
+
+
 if __name__ == "__main__":
     app.run(debug=True)
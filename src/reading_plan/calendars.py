@@ -0,0 +1,181 @@
+"""Defines the calendars that select the days of a reading plan.
+"""
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from itertools import compress
+from typing import Iterable, Iterator, List
+
+
+from .common import START_OF_WEEK
+
+
+# The number of days of the mask that iter_dates() builds at a time.
+MASK_CHUNK_DAYS = 7 * 52
+
+
+class ReadingCalendar:
+    """The reading days between two dates.
+
+    By default, the first num_times_to_read days of each week are reading days
+    (one day less in the first week, unless num_times_to_read is 1), where
+    weeks begin at START_OF_WEEK. Passing reading_weekdays reads on those
+    weekdays instead. Blackout dates are never reading days.
+
+    Reading days are stored as a bytearray with one byte per day of the plan,
+    so that weekdays and blackout dates are selected with slice assignments
+    rather than by walking the plan one day at a time.
+
+    Args:
+        start_date: The beginning of the reading plan.
+        end_date: The end of the reading plan.
+        num_times_to_read: The number of times to read per week.
+        reading_weekdays: The weekdays (as datetime.weekday() values) on which
+            to read.
+        blackout_dates: The dates on which not to read.
+    """
+
+    def __init__(self,
+                 start_date: datetime,
+                 end_date: datetime,
+                 num_times_to_read: int = 5,
+                 reading_weekdays: Iterable[int] = None,
+                 blackout_dates: Iterable[datetime] = None):
+        self.start_date = start_date
+        self.end_date = end_date
+        self.num_times_to_read = num_times_to_read
+        self.reading_weekdays = (sorted(set(reading_weekdays))
+                                 if reading_weekdays is not None else None)
+        self.num_days = max(0, (end_date - start_date).days + 1)
+        self._first_week_length = 7 - (
+            start_date.weekday() - START_OF_WEEK) % 7
+        self._blackout_offsets = sorted(
+            offset for offset in {(d - start_date).days
+                                  for d in blackout_dates or []}
+            if 0 <= offset < self.num_days and
+            self._is_weekly_reading_offset(offset))
+        self._mask = None
+
+    @property
+    def mask(self) -> bytearray:
+        """One byte per day of the plan, set to 1 on reading days."""
+        if self._mask is None:
+            self._mask = self._build_mask()
+        return self._mask
+
+    @property
+    def dates(self) -> List[datetime]:
+        """The reading days, in order."""
+        return [self.start_date + timedelta(days=offset)
+                for offset in compress(range(self.num_days), self.mask)]
+
+    def iter_dates(self) -> Iterator[datetime]:
+        """Iterates over the reading days, in order.
+
+        Unless the mask was already built, it is built MASK_CHUNK_DAYS at a
+        time, so that memory use does not grow with the length of the plan.
+
+        Returns:
+            The reading days.
+        """
+        for chunk_start in range(0, self.num_days, MASK_CHUNK_DAYS):
+            chunk_stop = min(chunk_start + MASK_CHUNK_DAYS, self.num_days)
+            mask = (self._mask[chunk_start:chunk_stop]
+                    if self._mask is not None else
+                    self._build_mask(chunk_start, chunk_stop))
+            for offset in compress(range(chunk_start, chunk_stop), mask):
+                yield self.start_date + timedelta(days=offset)
+
+    def is_reading_date(self, date: datetime) -> bool:
+        """Whether a date is a reading day.
+
+        Args:
+            date: The date to check.
+        """
+        return (self.count_reading_dates(date) >
+                self.count_reading_dates(date - timedelta(days=1)))
+
+    def count_reading_dates(self, date: datetime) -> int:
+        """Counts the reading days from the start date up to and including date.
+
+        The count is calculated without building the mask.
+
+        Args:
+            date: The last date to count.
+
+        Returns:
+            The number of reading days.
+        """
+        offset = min((date - self.start_date).days, self.num_days - 1)
+        if offset < 0:
+            return 0
+        return (self._count_weekly_reading_offsets(offset) -
+                bisect_right(self._blackout_offsets, offset))
+
+    def _build_mask(self, start: int = 0, stop: int = None) -> bytearray:
+        """Builds the mask of the days from offset start up to offset stop."""
+        if stop is None:
+            stop = self.num_days
+        mask = bytearray(stop - start)
+        if self.reading_weekdays is None:
+            first_week_days = min(self._first_week_reading_days,
+                                  self._first_week_length, stop)
+            if first_week_days > start:
+                mask[:first_week_days - start] = _ones(first_week_days - start)
+            for day_of_week in range(self._reading_days_per_week):
+                _set_every_seventh_day(
+                    mask, self._first_week_length + day_of_week - start)
+        else:
+            for weekday in self.reading_weekdays:
+                _set_every_seventh_day(
+                    mask, (weekday - self.start_date.weekday()) % 7 - start)
+        for offset in self._blackout_offsets[
+                bisect_left(self._blackout_offsets, start):
+                bisect_left(self._blackout_offsets, stop)]:
+            mask[offset - start] = 0
+        return mask
+
+    def _is_weekly_reading_offset(self, offset: int) -> bool:
+        return (self._count_weekly_reading_offsets(offset) >
+                self._count_weekly_reading_offsets(offset - 1))
+
+    def _count_weekly_reading_offsets(self, offset: int) -> int:
+        """Counts the reading days up to offset, ignoring blackout dates."""
+        if offset < 0:
+            return 0
+        if self.reading_weekdays is not None:
+            full_weeks, days_into_week = divmod(offset + 1, 7)
+            start_weekday = self.start_date.weekday()
+            return (full_weeks * len(self.reading_weekdays) +
+                    sum(1 for weekday in self.reading_weekdays
+                        if (weekday - start_weekday) % 7 < days_into_week))
+        first_week_days = self._first_week_reading_days
+        if offset < self._first_week_length:
+            return min(offset + 1, first_week_days)
+        days_per_week = self._reading_days_per_week
+        full_weeks, days_into_week = divmod(
+            offset - self._first_week_length, 7)
+        return (min(self._first_week_length, first_week_days) +
+                full_weeks * days_per_week +
+                min(days_into_week + 1, days_per_week))
+
+    @property
+    def _first_week_reading_days(self) -> int:
+        if self.num_times_to_read == 1:
+            return 1
+        return max(0, self.num_times_to_read - 1)
+
+    @property
+    def _reading_days_per_week(self) -> int:
+        return max(0, min(self.num_times_to_read, 7))
+
+
+def _set_every_seventh_day(mask: bytearray, first_offset: int):
+    """Sets every seventh day of mask, from first_offset (or, if it is before
+    the mask, from the first day of the mask on the same weekday)."""
+    if first_offset < 0:
+        first_offset %= 7
+    mask[first_offset::7] = _ones(len(range(first_offset, len(mask), 7)))
+
+
+def _ones(length: int) -> bytes:
+    return b'\x01' * length
@@ -1,16 +1,51 @@
 """Functions and variables that are used across many app and library files."""
 from datetime import datetime
 from math import ceil
+from typing import List
+
+
+# Day names mapped to datetime.weekday() values.
+WEEKDAYS = {'SUNDAY': 6,
+            'MONDAY': 0,
+            'TUESDAY': 1,
+            'WEDNESDAY': 2,
+            'THURSDAY': 3,
+            'FRIDAY': 4,
+            'SATURDAY': 5}
 
 
 # The day-key used will mark the 1st day of the week in the reading plans.
-START_OF_WEEK = {'SUNDAY': 6,
-                 'MONDAY': 0,
-                 'TUESDAY': 1,
-                 'WEDNESDAY': 2,
-                 'THURSDAY': 3,
-                 'FRIDAY': 4,
-                 'SATURDAY': 5}['MONDAY']
+START_OF_WEEK = WEEKDAYS['MONDAY']
+
+
+def parse_weekdays(weekdays: str) -> List[int]:
+    """Converts comma-separated day names into datetime.weekday() values.
+
+    Args:
+        weekdays: Day names such as 'monday,wednesday,friday'.
+
+    Returns:
+        The weekday values of the days.
+    """
+    try:
+        return [WEEKDAYS[day.strip().upper()]
+                for day in weekdays.split(',') if day.strip()]
+    except KeyError as e:
+        raise ValueError('Unknown day of the week: %s' % e.args[0])
+
+
+def parse_dates(dates: str, date_format: str) -> List[datetime]:
+    """Converts comma-separated dates into datetimes.
+
+    Args:
+        dates: Dates such as '01/01/2020,07/04/2020'.
+        date_format: The strptime format of each date.
+
+    Returns:
+        The datetimes of the dates.
+    """
+    return [datetime.strptime(date.strip(), date_format)
+            for date in dates.split(',') if date.strip()]
 
 
 # TODO: Verify that this method is working and use in writers.py.
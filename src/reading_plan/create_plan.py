@@ -5,6 +5,7 @@ import argparse
 from datetime import datetime
 
 
+from .common import parse_dates, parse_weekdays
 from .plans import BookReadingPlan
 from .writers import BookReadingPlanWriter
 
@@ -16,6 +17,12 @@ if __name__ == '__main__':
     parser.add_argument('--start-page', required=True, type=int)
     parser.add_argument('--end-page', required=True, type=int)
     parser.add_argument('--frequency', type=int, default=5)
+    parser.add_argument('--weekdays', default=None,
+                        help='Comma-separated days of the week on which to '
+                             'read, e.g. monday,wednesday,friday.')
+    parser.add_argument('--blackout-dates', default='',
+                        help='Comma-separated YYYYMMDD dates on which not '
+                             'to read.')
     parser.add_argument('--book-name', default='')
     parser.add_argument('--outdir', default='~/Desktop/')
     parser.add_argument('--excel', action='store_true')
@@ -28,12 +35,18 @@ if __name__ == '__main__':
 
     start_date = datetime.strptime(options.start_date, '%Y%m%d')
     end_date = datetime.strptime(options.end_date, '%Y%m%d')
+    reading_weekdays = (parse_weekdays(options.weekdays)
+                        if options.weekdays else None)
     book_reading_plan = BookReadingPlan(start_date=start_date,
                                         end_date=end_date,
                                         start_page=options.start_page,
                                         end_page=options.end_page,
                                         num_times_to_read=options.frequency,
-                                        name=options.book_name)
+                                        name=options.book_name,
+                                        reading_weekdays=reading_weekdays,
+                                        blackout_dates=parse_dates(
+                                            options.blackout_dates, '%Y%m%d'),
+                                        materialize_weeks=False)
 
     plan_writer = BookReadingPlanWriter(book_reading_plan)
     if options.excel:
@@ -1,15 +1,13 @@
 """Defines various reading plans.
 """
 from datetime import datetime, timedelta
-from typing import Any, List
+from typing import Iterable, Iterator, List
 
 
+from .calendars import ReadingCalendar
 from .common import START_OF_WEEK
 
 
-YEAR_LIMIT = 19  # writers.num_to_word() only calculates up to 999 weeks.
-
-
 class ReadingPlan:
     """A minimalist reading plan.
 
@@ -54,6 +52,32 @@ class ReadingPlan:
         return fdr
 
 
+class DailyReading(ReadingPlan):
+    """The reading assigned to a single date of a book reading plan.
+
+    Args:
+        date: The date of the reading.
+        start_page: The first page to read on the date (None if the date is
+            not a reading day).
+        end_page: The last page to read on the date (None if the date is not
+            a reading day).
+        week_number: The week of the reading plan in which the date falls.
+        pages_remaining: The number of pages left to read after the date.
+    """
+
+    def __init__(self,
+                 date: datetime = None,
+                 start_page: int = None,
+                 end_page: int = None,
+                 week_number: int = None,
+                 pages_remaining: int = None):
+        super(DailyReading, self).__init__(
+            start_date=date, end_date=date, start_page=start_page,
+            end_page=end_page)
+        self.week_number = week_number
+        self.pages_remaining = pages_remaining
+
+
 class BookReadingPlan(ReadingPlan):
     """A reading plan based off multiple weeks of reading.
 
@@ -64,6 +88,15 @@ class BookReadingPlan(ReadingPlan):
         end_page: The last page of the reading plan.
         num_times_to_read: The number of times to read during the reading plan.
         name: The name of the reading plan.
+        reading_weekdays: The weekdays (as datetime.weekday() values) on which
+            to read, instead of the first num_times_to_read days of each week.
+        blackout_dates: The dates on which not to read.
+        max_days: The most days from start_date to end_date for which a plan
+            may be generated (no limit if None).
+        materialize_weeks: Whether to store every week in self.weeks.  If
+            False, weeks are only generated on demand by iter_weeks(), so that
+            memory use does not grow with the length of the plan, and accessing
+            self.weeks raises a RuntimeError.
     """
 
     def __init__(self,
@@ -72,40 +105,82 @@ class BookReadingPlan(ReadingPlan):
                  start_page: int = None,
                  end_page: int = None,
                  num_times_to_read: int = 5,
-                 name: str = None):
+                 name: str = None,
+                 reading_weekdays: Iterable[int] = None,
+                 blackout_dates: Iterable[datetime] = None,
+                 max_days: int = None,
+                 materialize_weeks: bool = True):
         super(BookReadingPlan, self).__init__(
             start_date, end_date, start_page, end_page, num_times_to_read, name)
         if start_date > end_date:
             raise ValueError('Start Date must be smaller than End Date!')
-        if (end_date - start_date).days > 365 * YEAR_LIMIT:
+        if max_days is not None and (end_date - start_date).days > max_days:
             raise ValueError(
-                'Plans can only be generated for 3 years of reading or less!')
-        self.weeks = []
-        self.populate_weeks()
+                'Plans can only be generated for %d days of reading or less!'
+                % max_days)
+        self.calendar = ReadingCalendar(start_date, end_date,
+                                        num_times_to_read, reading_weekdays,
+                                        blackout_dates)
+        self.materialize_weeks = materialize_weeks
+        self._weeks = []
+        if materialize_weeks:
+            self.populate_weeks()
+
+    @property
+    def weeks(self) -> List[ReadingPlan]:
+        """The single-week reading plans, if they were materialized."""
+        if not self.materialize_weeks:
+            raise RuntimeError('The weeks of this plan were not materialized; '
+                               'use iter_weeks() instead.')
+        return self._weeks
 
     def populate_weeks(self):
-        """Generates a multi-week reading plan and stores it in self.weeks."""
-        pages = self.pages
-        dates = self.get_dates_in_plan()
-        split_pages = _split_n_times(pages, len(dates))
+        """Generates a multi-week reading plan and stores it in self.weeks.
+
+        Weeks without any reading days are kept as empty week-long plans, so
+        that the position of a week in self.weeks is its week number.
+        """
+        self._weeks.extend(self._generate_weeks(self.get_dates_in_plan()))
+        self.materialize_weeks = True
+
+    def iter_weeks(self) -> Iterator[ReadingPlan]:
+        """Iterates over the weeks of the reading plan.
+
+        If the weeks were not materialized, they are generated one at a time
+        (on every call) without storing the plan's dates or pages.
+
+        Returns:
+            The single-week reading plans.
+        """
+        if self.materialize_weeks:
+            return iter(self._weeks)
+        return self._generate_weeks(self.calendar.iter_dates())
+
+    def _generate_weeks(self, dates: Iterable[datetime]
+                        ) -> Iterator[ReadingPlan]:
+        num_pages = len(self.pages)
+        num_days = min(num_pages,
+                       self.calendar.count_reading_dates(self.end_date))
         days = []
-        for d, pages in zip(dates, split_pages):
-            if d.weekday() == START_OF_WEEK and d != self.start_date:
-                if self.num_times_to_read != 1 or days:
-                    week_long_plan = self.create_week_long_plan(days)
-                    self.weeks.append(week_long_plan)
-                    days = []
-            start_page = end_page = list(pages).pop(0)
-            for page in pages[1:]:
-                end_page = page
-            day = ReadingPlan(start_date=d,
-                              end_date=d,
-                              start_page=start_page,
-                              end_page=end_page)
+        week_number = 1
+        for i, d in zip(range(num_days), dates):
+            day_week_number = _get_week_number(self.start_date, d)
+            if day_week_number != week_number:
+                yield (self.create_week_long_plan(days) if days else
+                       self.create_empty_week_long_plan(week_number))
+                for skipped_week_number in range(week_number + 1,
+                                                 day_week_number):
+                    yield self.create_empty_week_long_plan(skipped_week_number)
+                week_number = day_week_number
+                days = []
+            day = ReadingPlan(
+                start_date=d,
+                end_date=d,
+                start_page=self.start_page + i * num_pages // num_days,
+                end_page=self.start_page + (i + 1) * num_pages // num_days - 1)
             days.append(day)
         if days:
-            week_long_plan = self.create_week_long_plan(days)
-            self.weeks.append(week_long_plan)
+            yield self.create_week_long_plan(days)
 
     def create_week_long_plan(self, days: List[datetime]) -> ReadingPlan:
         """Generates a single-week reading plan.
@@ -116,14 +191,9 @@ class BookReadingPlan(ReadingPlan):
         Returns:
             A single-week reading plan.
         """
-        if days[-1].end_date == self.end_date:
-            end_date = self.end_date
-        else:
-            cur_date = days[-1].end_date
-            while (cur_date.weekday() != START_OF_WEEK or
-                   cur_date == days[0].start_date):
-                cur_date += timedelta(days=1)
-            end_date = cur_date - timedelta(days=1)
+        last_date = days[-1].end_date
+        end_date = min(last_date + timedelta(
+            days=(START_OF_WEEK - last_date.weekday() - 1) % 7), self.end_date)
         week_long_plan = ReadingPlan(start_date=days[0].start_date,
                                      end_date=end_date,
                                      start_page=days[0].start_page,
@@ -132,38 +202,152 @@ class BookReadingPlan(ReadingPlan):
         week_long_plan.days = days
         return week_long_plan
 
+    def create_empty_week_long_plan(self, week_number: int) -> ReadingPlan:
+        """Generates a single-week reading plan without any reading days.
+
+        Args:
+            week_number: The week of the reading plan.
+
+        Returns:
+            A single-week reading plan.
+        """
+        start_of_first_week = self.start_date - timedelta(
+            days=(self.start_date.weekday() - START_OF_WEEK) % 7)
+        start_date = start_of_first_week + timedelta(weeks=week_number - 1)
+        return ReadingPlan(start_date=max(start_date, self.start_date),
+                           end_date=min(start_date + timedelta(days=6),
+                                        self.end_date),
+                           num_times_to_read=self.num_times_to_read)
+
     def get_dates_in_plan(self) -> List[datetime]:
         """Gets the days in a reading plan.
 
         Returns:
             The days in a reading plan.
         """
-        all_dates = _get_days(self.start_date, self.end_date)
-        dates = self.adjust_dates_for_reading_frequency(all_dates)
-        return dates
+        return self.calendar.dates
 
-    def adjust_dates_for_reading_frequency(self, all_dates: List[datetime]):
-        """Remaps consecutive days to days that satisfy the reading frequency.
 
-        Returns:
-            The days that satisfy the reading frequency per week.
-        """
-        dates = []
-        cur_date = all_dates[0]
-        dates_per_week = 0
-        if self.num_times_to_read == 1:
-            dates.append(cur_date)
-        while not cur_date > self.end_date:
-            dates_per_week += 1
-            if (cur_date.weekday() == START_OF_WEEK and
-                    cur_date != self.start_date):
-                dates_per_week = 0
-            if dates_per_week >= self.num_times_to_read:
-                cur_date += timedelta(days=1)
-                continue
-            dates.append(cur_date)
-            cur_date += timedelta(days=1)
-        return dates
+def get_reading_for_date(date: datetime,
+                         start_date: datetime,
+                         end_date: datetime,
+                         start_page: int,
+                         end_page: int,
+                         num_times_to_read: int = 5,
+                         reading_weekdays: Iterable[int] = None,
+                         blackout_dates: Iterable[datetime] = None
+                         ) -> DailyReading:
+    """Gets the reading for a single date without building the whole plan.
+
+    The result matches the day found in BookReadingPlan.weeks for the same
+    arguments, but is calculated without walking the days of the plan.  Each
+    call builds a ReadingCalendar, which sorts the blackout dates; to look up
+    many dates of the same plan in constant time, build the calendar once and
+    use get_reading_from_calendar().
+
+    Args:
+        date: The date to look up.
+        start_date: The beginning of the reading plan.
+        end_date: The end of the reading plan.
+        start_page: The first page of the reading plan.
+        end_page: The last page of the reading plan.
+        num_times_to_read: The number of times to read per week.
+        reading_weekdays: The weekdays (as datetime.weekday() values) on which
+            to read.
+        blackout_dates: The dates on which not to read.
+
+    Returns:
+        The reading for the date.
+    """
+    if start_date > end_date:
+        raise ValueError('Start Date must be smaller than End Date!')
+    calendar = ReadingCalendar(start_date, end_date, num_times_to_read,
+                               reading_weekdays, blackout_dates)
+    return get_reading_from_calendar(date, calendar, start_page, end_page)
+
+
+def get_readings_for_date_range(date: datetime,
+                                num_days: int,
+                                start_date: datetime,
+                                end_date: datetime,
+                                start_page: int,
+                                end_page: int,
+                                num_times_to_read: int = 5,
+                                reading_weekdays: Iterable[int] = None,
+                                blackout_dates: Iterable[datetime] = None
+                                ) -> List[DailyReading]:
+    """Gets the readings for consecutive dates without building the whole plan.
+
+    Dates before the start or past the end of the reading plan are left out.
+
+    Args:
+        date: The first date to look up.
+        num_days: The number of consecutive dates to look up (at least 1).
+        start_date: The beginning of the reading plan.
+        end_date: The end of the reading plan.
+        start_page: The first page of the reading plan.
+        end_page: The last page of the reading plan.
+        num_times_to_read: The number of times to read per week.
+        reading_weekdays: The weekdays (as datetime.weekday() values) on which
+            to read.
+        blackout_dates: The dates on which not to read.
+
+    Returns:
+        The readings for each date.
+    """
+    if start_date > end_date:
+        raise ValueError('Start Date must be smaller than End Date!')
+    if num_days < 1:
+        raise ValueError('Number of days must be 1 or greater!')
+    calendar = ReadingCalendar(start_date, end_date, num_times_to_read,
+                               reading_weekdays, blackout_dates)
+    first_date = max(date, start_date)
+    last_date = date + timedelta(days=min(num_days - 1,
+                                          (end_date - date).days))
+    return [get_reading_from_calendar(d, calendar, start_page, end_page)
+            for d in _get_days(first_date, last_date)]
+
+
+def get_reading_from_calendar(date: datetime,
+                              calendar: ReadingCalendar,
+                              start_page: int,
+                              end_page: int) -> DailyReading:
+    """Gets the reading for a single date of a prebuilt reading calendar.
+
+    The lookup takes constant time (logarithmic in the number of blackout
+    dates), so one calendar can serve many lookups.
+
+    Args:
+        date: The date to look up.
+        calendar: The reading days of the reading plan.
+        start_page: The first page of the reading plan.
+        end_page: The last page of the reading plan.
+
+    Returns:
+        The reading for the date.
+    """
+    if not calendar.start_date <= date <= calendar.end_date:
+        raise ValueError('Date must be between Start Date and End Date!')
+    num_pages = end_page - start_page + 1
+    num_days = min(num_pages,
+                   calendar.count_reading_dates(calendar.end_date))
+    dates_read = calendar.count_reading_dates(date)
+    pages_read = (num_pages * min(dates_read, num_days) // num_days
+                  if num_days > 0 else 0)
+    reading = DailyReading(
+        date=date,
+        week_number=_get_week_number(calendar.start_date, date),
+        pages_remaining=num_pages - pages_read)
+    if calendar.is_reading_date(date) and dates_read <= num_days:
+        reading.start_page = (start_page +
+                              num_pages * (dates_read - 1) // num_days)
+        reading.end_page = start_page + pages_read - 1
+    return reading
+
+
+def _get_week_number(start_date: datetime, date: datetime) -> int:
+    start_of_week_offset = (start_date.weekday() - START_OF_WEEK) % 7
+    return (start_of_week_offset + (date - start_date).days) // 7 + 1
 
 
 def _get_days(from_date: datetime, to_date: datetime) -> List[datetime]:
@@ -174,8 +358,3 @@ def _get_days(from_date: datetime, to_date: datetime) -> List[datetime]:
             days.append(cur_day)
             cur_day += timedelta(days=1)
     return days
-
-
-def _split_n_times(items: List[Any], n: int) -> List[List[Any]]:
-    n = min(len(items), n)
-    return [items[i*len(items)//n:(i+1)*len(items)//n] for i in range(0, n)]
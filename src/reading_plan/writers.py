@@ -1,12 +1,32 @@
+"""Writes reading plans to disk.
+
+Concurrency contract:
+    * BookReadingPlanWriter holds no state between calls, so one instance (or
+      many instances sharing a BookReadingPlan) may write from any number of
+      threads or processes at once.
+    * Every write renders into its own uniquely named file.  When a fixed
+      outfile name is requested, the finished file is atomically moved onto
+      it, so concurrent writes to the same directory never see each other's
+      partial files (the last one to finish wins).
+    * ReadingPlanWriter and its subclasses keep their write head (page, row
+      and column) on the instance, so each instance writes a single file and
+      must not be shared between threads.
+    * BookReadingPlans are not modified while they are written.
+"""
 # native python libs
+from concurrent.futures import Executor, ThreadPoolExecutor
+from contextvars import ContextVar
 import os
 import csv
 import string
 import calendar
-from typing import Callable, List
+from itertools import repeat
+from typing import Callable, Iterable, List, Type
 import uuid
+from zipfile import ZIP_DEFLATED, ZIP_STORED, ZipFile
 
 import xlsxwriter
+import xlsxwriter.workbook
 
 from .plans import BookReadingPlan, ReadingPlan
 
@@ -18,6 +38,13 @@ BLANK_COLUMNS = 2
 EXCEL_COLUMNS = dict(enumerate(string.ascii_uppercase, 1))
 DEFAULT_CELL = 0
 OUT_FILENAME = 'reading-plan'
+# How to package xlsx files, from fastest to smallest.  None leaves the file as
+# packaged by xlsxwriter; otherwise it is packaged with the given zip
+# compression type and level.
+XLSX_COMPRESSION_MODES = {'stored': (ZIP_STORED, None),
+                          'fast': (ZIP_DEFLATED, 1),
+                          'default': None,
+                          'smallest': (ZIP_DEFLATED, 9)}
 
 
 class BookReadingPlanWriter():
@@ -29,38 +56,54 @@ class BookReadingPlanWriter():
     def __init__(self, book_reading_plan: BookReadingPlan):
         self.plan = book_reading_plan
 
-    def write_excel(self, outdir: str, format_outfile: bool = True):
+    def write_excel(self,
+                    outdir: str,
+                    format_outfile: bool = True,
+                    compression: str = 'default',
+                    unique_outfile: bool = None):
         """Writes the reading plan as an excel file to disk.
 
         Args:
             outdir: The directory to which to write the reading plan.
             format_outfile: Whether to attempt to format the plan (for
                 printer-friendly results).
+            compression: A key of XLSX_COMPRESSION_MODES.
+            unique_outfile: Whether to keep the uniquely named file rather than
+                moving it to OUT_FILENAME (defaults to whether outdir is /tmp).
 
         Returns:
             The path to the excel reading plan.
         """
-        return self._write(
-            ExcelWeekLongWriter, outdir, format_outfile, self.plan.name)
-
-    def write_csv(self, outdir: str, format_outfile: bool = True):
+        return self._write(ExcelWeekLongWriter, outdir, format_outfile,
+                           self.plan.name, unique_outfile,
+                           compression=compression)
+
+    def write_csv(self,
+                  outdir: str,
+                  format_outfile: bool = True,
+                  unique_outfile: bool = None):
         """Writes the reading plan as a CSV file to disk.
 
         Args:
             outdir: The directory to which to write the reading plan.
             format_outfile: Whether to attempt to format the plan (for
                 printer-friendly results).
+            unique_outfile: Whether to keep the uniquely named file rather than
+                moving it to OUT_FILENAME (defaults to whether outdir is /tmp).
 
         Returns:
             The path to the CSV reading plan.
         """
-        return self._write(CsvWeekLongWriter, outdir, format_outfile)
+        return self._write(CsvWeekLongWriter, outdir, format_outfile,
+                           unique_outfile=unique_outfile)
 
     def _write(self,
                writer_class, # TODO: Type hint with ReadingPlanWriter.
                outdir: str,
                format_outfile: bool = True,
-               plan_name: str = None) -> str:
+               plan_name: str = None,
+               unique_outfile: bool = None,
+               **writer_kwargs) -> str:
         """Writes the reading plan to disk.
 
         Args:
@@ -69,22 +112,82 @@ class BookReadingPlanWriter():
             format_outfile: Whether to attempt to format the plan (for
                 printer-friendly results).
             plan_name: The name of the reading plan.
+            unique_outfile: Whether to keep the uniquely named file rather than
+                moving it to OUT_FILENAME (defaults to whether outdir is /tmp).
+            writer_kwargs: Extra keyword arguments for the writer.
 
         Returns:
             The path to the excel reading plan.
         """
-        outfile = os.path.join(outdir, OUT_FILENAME)
-        if outdir == '/tmp':
-            outfile += str(uuid.uuid4())
-        writer_args = [outfile, format_outfile]
+        if unique_outfile is None:
+            unique_outfile = outdir == '/tmp'
+        outfile = os.path.join(os.path.expanduser(outdir), OUT_FILENAME)
+        writer_args = [outfile + str(uuid.uuid4()), format_outfile]
         if plan_name:
             writer_args += [plan_name]
-        weekly_writer = writer_class(*writer_args)
-        for week in self.plan.weeks:
-            weekly_writer.write_week(week)
-        weekly_writer.write_weekly_summary(self.plan.weeks)
-        weekly_writer.close()
-        return weekly_writer.outfile
+        weekly_writer = writer_class(*writer_args, **writer_kwargs)
+        try:
+            for week in self.plan.iter_weeks():
+                weekly_writer.write_week(week)
+            weekly_writer.write_weekly_summary()
+            weekly_writer.close()
+        except Exception:
+            weekly_writer.abort()
+            if os.path.exists(weekly_writer.outfile):
+                os.remove(weekly_writer.outfile)
+            raise
+        if unique_outfile:
+            return weekly_writer.outfile
+        outfile += os.path.splitext(weekly_writer.outfile)[1]
+        os.replace(weekly_writer.outfile, outfile)
+        return outfile
+
+
+def write_plans(plans: Iterable[BookReadingPlan],
+                outdir: str,
+                file_type: str = 'excel',
+                format_outfile: bool = True,
+                executor_class: Type[Executor] = ThreadPoolExecutor,
+                max_workers: int = None,
+                **write_kwargs) -> List[str]:
+    """Writes many reading plans in parallel.
+
+    Each plan is written to its own uniquely named file.  xlsxwriter is pure
+    python, so a ProcessPoolExecutor is needed to render on more than one CPU
+    at a time; the plans are then pickled to the worker processes.
+
+    Args:
+        plans: The reading plans to write.
+        outdir: The directory to which to write the reading plans.
+        file_type: 'excel' or 'csv'.
+        format_outfile: Whether to attempt to format the plans (for
+            printer-friendly results).
+        executor_class: The type of the pool on which to write the plans.
+        max_workers: The size of the pool.
+        write_kwargs: Extra keyword arguments for write_excel or write_csv.
+
+    Returns:
+        The paths to the reading plans, in the same order as plans.
+    """
+    if file_type not in ['excel', 'csv']:
+        raise ValueError('Unknown reading plan file type: %s' % file_type)
+    with executor_class(max_workers=max_workers) as executor:
+        return list(executor.map(_write_plan,
+                                 plans,
+                                 repeat(outdir),
+                                 repeat(file_type),
+                                 repeat(format_outfile),
+                                 repeat(write_kwargs)))
+
+
+def _write_plan(plan: BookReadingPlan,
+                outdir: str,
+                file_type: str,
+                format_outfile: bool,
+                write_kwargs: dict) -> str:
+    write = getattr(BookReadingPlanWriter(plan), 'write_' + file_type)
+    return write(outdir, format_outfile=format_outfile, unique_outfile=True,
+                 **write_kwargs)
 
 
 def post_increment_row(func: Callable):
@@ -124,6 +227,8 @@ class ReadingPlanWriter():
         self.blank_columns = blank_columns
         self.column_overflow_buffer = self.column_limit - 1
         self._weeks_seen = 0
+        # The week number and date range of each week written with days.
+        self._weekly_summaries = []
 
     def write_week(self, week: ReadingPlan):
         """Write a week of reading plan data to disk.
@@ -135,6 +240,8 @@ class ReadingPlanWriter():
         self._weeks_seen += 1
         if not week.days:
             return
+        self._weekly_summaries.append((self._weeks_seen,
+                                       week.formatted_date_range))
         month_name = MONTHS[week.start_date.month]
         if self.format_outfile:
             self.select_column_and_page(len(week.days))
@@ -178,11 +285,13 @@ class ReadingPlanWriter():
         """Updates the writer head to point to the next row"""
         self.row += 1
 
-    def write_weekly_summary(self, weeks: List[ReadingPlan]):
+    def write_weekly_summary(self, weeks: Iterable[ReadingPlan] = None):
         """Writes a summary of each week of reading.
 
         Args:
-            weeks: A list of reading plans.
+            weeks: The single-week reading plans (defaults to the weeks that
+                were passed to write_week, so that they are not generated
+                twice).
         """
         if self.format_outfile:
             while not self.has_reached_row_limit:
@@ -193,14 +302,18 @@ class ReadingPlanWriter():
         # TODO: Correctly calculate the first weekday `first_weekday = weeks[0].start_date.weekday()`
         #                                             `start_week_offset = int(first_weekday == START_OF_WEEK)``
         start_week_offset = 1
-        for week_number, week in enumerate(weeks, start_week_offset):
-            if not week.days:
-                continue
+        weekly_summaries = (self._weekly_summaries if weeks is None else
+                            [(week_number, week.formatted_date_range)
+                             for week_number, week in enumerate(
+                                 weeks, start_week_offset) if week.days])
+        for week_number, formatted_date_range in weekly_summaries:
             if self.format_outfile:
                 self.select_column_and_page(1)
             # TODO(#3): Format responsively for weeks higher than 100.
-            weekly_summary_row = ('___ %s' % num_to_word(week_number)
-                                  ).ljust(20, '.') + week.formatted_date_range
+            week_label = '___ %s' % num_to_word(week_number)
+            weekly_summary_row = (week_label.ljust(max(20, len(week_label) + 1),
+                                                   '.') +
+                                  formatted_date_range)
             self.write_data(weekly_summary_row)
 
     @property
@@ -232,6 +345,13 @@ class ReadingPlanWriter():
         """Closes the writer."""
         raise NotImplementedError
 
+    def abort(self):
+        """Releases the writer's open files without finishing the outfile.
+
+        Called when a write fails, before the outfile is removed.  Does
+        nothing unless overridden by writers that hold files open.
+        """
+
 
 class ExcelWeekLongWriter(ReadingPlanWriter):
     """Writes a WeekLongReadingPlan as an Excel spreadsheet to disk.
@@ -241,14 +361,19 @@ class ExcelWeekLongWriter(ReadingPlanWriter):
         format_outfile: Whether to attempt to format the plan (for
             printer-friendly results).
         plan_name: The name of the reading plan.
+        compression: A key of XLSX_COMPRESSION_MODES.
     """
 
     def __init__(self,
                  outfile: str = None,
                  format_outfile: bool = True,
-                 plan_name: str = None):
+                 plan_name: str = None,
+                 compression: str = 'default'):
         outfile = os.path.expanduser(outfile)+'.xlsx'
+        if compression not in XLSX_COMPRESSION_MODES:
+            raise ValueError('Unknown xlsx compression mode: %s' % compression)
         self.plan_name = plan_name
+        self.compression = compression
         super(ExcelWeekLongWriter, self).__init__(outfile, format_outfile)
 
     @post_increment_row
@@ -275,9 +400,11 @@ class ExcelWeekLongWriter(ReadingPlanWriter):
         return '%s%s' % (EXCEL_COLUMNS[column], row)
 
     def open(self):
-        if os.path.exists(self.outfile):
-            os.remove(self.outfile)
-        self.workbook = xlsxwriter.Workbook(self.outfile)
+        # Unformatted plans are written one row after another, so rows can be
+        # flushed to disk as they are written.
+        self.workbook = _Workbook(
+            self.outfile, {'constant_memory': not self.format_outfile},
+            XLSX_COMPRESSION_MODES[self.compression])
         self.worksheet = self.workbook.add_worksheet()
         self.bold = self.workbook.add_format({'bold': self.format_outfile})
         if self.format_outfile:
@@ -295,6 +422,63 @@ class ExcelWeekLongWriter(ReadingPlanWriter):
                 [1 + i * self.row_limit for i in range(1, self.page)])
         self.workbook.close()
 
+    def abort(self):
+        # In constant_memory mode, xlsxwriter buffers rows in a temp file that
+        # is only closed and removed by Workbook.close().
+        if getattr(self.worksheet, 'row_data_fh', None):
+            self.worksheet.row_data_fh.close()
+            if os.path.exists(self.worksheet.row_data_filename):
+                os.remove(self.worksheet.row_data_filename)
+
+
+# The zip compression type and level of the workbook being packaged in the
+# current thread, if not xlsxwriter's.
+_XLSX_PACKAGING = ContextVar('xlsx_packaging', default=None)
+
+
+class _PackagingZipFile(ZipFile):
+    """The ZipFile used by xlsxwriter, with the compression of _XLSX_PACKAGING.
+
+    xlsxwriter always deflates at zlib's default level, so the compression is
+    swapped in when the zip file is created rather than by repackaging the
+    finished workbook.
+    """
+    def __init__(self, *args, **kwargs):
+        packaging = _XLSX_PACKAGING.get()
+        if packaging:
+            kwargs['compression'], kwargs['compresslevel'] = packaging
+        super(_PackagingZipFile, self).__init__(*args, **kwargs)
+
+
+# The compression modes rely on these xlsxwriter internals; without them, every
+# mode would silently fall back to xlsxwriter's own packaging.
+if not (hasattr(xlsxwriter.workbook, 'ZipFile') and
+        hasattr(xlsxwriter.workbook.Workbook, '_store_workbook')):
+    raise ImportError('xlsxwriter %s does not support XLSX_COMPRESSION_MODES; '
+                      'install the version in requirements.txt.' %
+                      xlsxwriter.__version__)
+xlsxwriter.workbook.ZipFile = _PackagingZipFile
+
+
+class _Workbook(xlsxwriter.Workbook):
+    """A Workbook that is packaged with the given zip compression.
+
+    Args:
+        filename: The path to which to write the workbook.
+        options: The xlsxwriter workbook options.
+        packaging: A value of XLSX_COMPRESSION_MODES.
+    """
+    def __init__(self, filename: str, options: dict, packaging: tuple = None):
+        super(_Workbook, self).__init__(filename, options)
+        self.packaging = packaging
+
+    def _store_workbook(self):
+        token = _XLSX_PACKAGING.set(self.packaging)
+        try:
+            super(_Workbook, self)._store_workbook()
+        finally:
+            _XLSX_PACKAGING.reset(token)
+
 
 class CsvWeekLongWriter(ReadingPlanWriter):
     """Writes a WeekLongReadingPlan as a CSV to disk.
@@ -314,13 +498,16 @@ class CsvWeekLongWriter(ReadingPlanWriter):
         self.write(data)
 
     def write(self, cell: str):
+        if not self.format_outfile:
+            # Unformatted plans only use the first column, so each cell is a
+            # row of its own and can be written out immediately.
+            self.csv_writer.writerow([cell])
+            return
         while len(self.rows) < self.row:
             self.rows.append([])
         self.rows[self.row-1].extend([cell])
 
     def open(self):
-        if os.path.exists(self.outfile):
-            os.remove(self.outfile)
         self.readingplan = open(os.path.expanduser(self.outfile), 'w')
         self.csv_writer = csv.writer(self.readingplan,
                                      delimiter=',',
@@ -331,11 +518,14 @@ class CsvWeekLongWriter(ReadingPlanWriter):
         self.csv_writer.writerows(self.rows)
         self.readingplan.close()
 
+    def abort(self):
+        self.readingplan.close()
+
 
 def num_to_word(num: int) -> str:
     """Converts a number to a word.
 
-    The number must be between 1 and 999.
+    The number must be 1 or greater.
 
     Args:
         num: A number to convert to a word.
@@ -343,12 +533,23 @@ def num_to_word(num: int) -> str:
     Returns:
         A word representation of a number.
     """
-    if num > 999 or num < 0:
+    if num < 1:
         raise NotImplementedError(
             'Number out of implemented range of numbers.')
+    return _num_to_word(num)
+
+
+def _num_to_word(num: int) -> str:
+    if num > 999:
+        scale = min(len(str(num)) - 1, 3 * (len(SCALE_NUMBERS) - 1)) // 3
+        scaled, rest = divmod(num, 1000 ** scale)
+        return ' '.join(filter(None, [_num_to_word(scaled),
+                                      SCALE_NUMBERS[scale],
+                                      _num_to_word(rest)]))
     if num > 99:
         hundreds, tens_and_ones = divmod(num, 100)
-        return BASE_NUMBERS[hundreds] + ' Hundred ' + num_to_word(tens_and_ones)
+        return ' '.join(filter(None, [BASE_NUMBERS[hundreds], 'Hundred',
+                                      _num_to_word(tens_and_ones)]))
     if num > 19:
         tens, ones = divmod(num, 10)
         return TENS_NUMBERS[tens] + ('-' + BASE_NUMBERS[ones] if ones else '')
@@ -362,3 +563,4 @@ BASE_NUMBERS = {0: '', 1: 'One', 2: 'Two', 3: 'Three', 4: 'Four', 5: 'Five',
                 19: 'Nineteen'}
 TENS_NUMBERS = ['', '', 'Twenty', 'Thirty', 'Forty', 'Fifty',
                 'Sixty', 'Seventy', 'Eighty', 'Ninety']
+SCALE_NUMBERS = ['', 'Thousand', 'Million', 'Billion', 'Trillion']
@@ -0,0 +1,80 @@
+"""Unit tests for calendars.py.
+"""
+from datetime import datetime, timedelta
+import unittest
+from unittest import mock
+
+
+from src.reading_plan import calendars
+from src.reading_plan.calendars import ReadingCalendar
+
+class TestReadingCalendar(unittest.TestCase):
+    """Test class for ReadingCalendar."""
+
+    def test_dates_reading_weekdays(self) -> None:
+        """Test that only the reading weekdays are reading days."""
+        start_date = datetime(2000, 1, 1) # Saturday
+        end_date = datetime(2000, 1, 16) # Sunday
+        calendar = ReadingCalendar(start_date, end_date,
+                                   reading_weekdays=[0, 2])
+
+        expected_result = [datetime(2000, 1, 3), datetime(2000, 1, 5),
+                           datetime(2000, 1, 10), datetime(2000, 1, 12)]
+        self.assertEqual(calendar.dates, expected_result)
+
+    def test_dates_blackout_dates(self) -> None:
+        """Test that blackout dates are not reading days."""
+        start_date = datetime(2000, 1, 3) # Monday
+        end_date = datetime(2000, 1, 16) # Sunday
+        blackout_dates = [datetime(2000, 1, 4), datetime(2000, 1, 11),
+                          datetime(2001, 1, 1)]
+        calendar = ReadingCalendar(start_date, end_date, num_times_to_read=3,
+                                   blackout_dates=blackout_dates)
+
+        expected_result = [datetime(2000, 1, 3), datetime(2000, 1, 10),
+                           datetime(2000, 1, 12)]
+        self.assertEqual(calendar.dates, expected_result)
+
+    def test_count_reading_dates_matches_dates(self) -> None:
+        """Test that counting reading days agrees with the listed dates."""
+        start_date = datetime(2000, 1, 5) # Wednesday
+        end_date = datetime(2000, 3, 31)
+        blackout_dates = [start_date + timedelta(days=i)
+                          for i in range(0, 80, 3)]
+        for reading_weekdays in [None, [1, 3, 5, 6]]:
+            calendar = ReadingCalendar(start_date, end_date,
+                                       num_times_to_read=4,
+                                       reading_weekdays=reading_weekdays,
+                                       blackout_dates=blackout_dates)
+            dates = calendar.dates
+            for i in range((end_date - start_date).days + 1):
+                date = start_date + timedelta(days=i)
+                self.assertEqual(calendar.count_reading_dates(date),
+                                 len([d for d in dates if d <= date]))
+                self.assertEqual(calendar.is_reading_date(date),
+                                 date in dates)
+
+    def test_iter_dates_matches_dates(self) -> None:
+        """Test that building the mask in chunks gives the same reading days."""
+        start_date = datetime(2000, 1, 5) # Wednesday
+        end_date = datetime(2000, 3, 31)
+        blackout_dates = [start_date + timedelta(days=i)
+                          for i in range(0, 80, 3)]
+        for chunk_days in [1, 5, 7, 10, calendars.MASK_CHUNK_DAYS]:
+            for num_times_to_read in [1, 4, 7]:
+                for reading_weekdays in [None, [1, 3, 5, 6]]:
+                    calendar = ReadingCalendar(
+                        start_date, end_date,
+                        num_times_to_read=num_times_to_read,
+                        reading_weekdays=reading_weekdays,
+                        blackout_dates=blackout_dates)
+                    with mock.patch.object(calendars, 'MASK_CHUNK_DAYS',
+                                           chunk_days):
+                        dates = list(calendar.iter_dates())
+                    self.assertEqual(dates, calendar.dates)
+                    self.assertEqual(len(dates), calendar.count_reading_dates(
+                        end_date))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,10 +1,14 @@
 """Unit tests for plans.py.
 """
-from datetime import datetime
+from datetime import datetime, timedelta
 import unittest
 
 
-from src.reading_plan.plans import ReadingPlan
+from src.reading_plan.calendars import ReadingCalendar
+from src.reading_plan.plans import (BookReadingPlan, ReadingPlan,
+                                    get_reading_for_date,
+                                    get_reading_from_calendar,
+                                    get_readings_for_date_range)
 
 class TestReadingPlan(unittest.TestCase):
     """Test class for ReadingPlan."""
@@ -55,5 +59,165 @@ class TestReadingPlan(unittest.TestCase):
         self.assertEqual(plan.formatted_date_range, expected_result)
 
 
+class TestBookReadingPlan(unittest.TestCase):
+    """Test class for BookReadingPlan."""
+
+    def test_weeks_without_reading_days(self) -> None:
+        """Test that blacked out weeks are kept as empty weeks."""
+        start_date = datetime(2000, 1, 3) # Monday
+        end_date = datetime(2000, 1, 22) # Saturday
+        blackout_dates = [datetime(2000, 1, 10) + timedelta(days=i)
+                          for i in range(7)]
+        plan = BookReadingPlan(start_date=start_date,
+                               end_date=end_date,
+                               start_page=1,
+                               end_page=40,
+                               reading_weekdays=[0, 5],
+                               blackout_dates=blackout_dates)
+
+        self.assertEqual([len(week.days) for week in plan.weeks], [2, 0, 2])
+        self.assertEqual([(week.start_date, week.end_date)
+                          for week in plan.weeks],
+                         [(datetime(2000, 1, 3), datetime(2000, 1, 9)),
+                          (datetime(2000, 1, 10), datetime(2000, 1, 16)),
+                          (datetime(2000, 1, 17), datetime(2000, 1, 22))])
+
+    def test_max_days(self) -> None:
+        """Test that plans longer than max_days throw an error."""
+        start_date = datetime(2000, 1, 1)
+        BookReadingPlan(start_date=start_date,
+                        end_date=start_date + timedelta(days=10),
+                        start_page=1,
+                        end_page=40,
+                        max_days=10)
+        with self.assertRaises(ValueError):
+            BookReadingPlan(start_date=start_date,
+                            end_date=start_date + timedelta(days=11),
+                            start_page=1,
+                            end_page=40,
+                            max_days=10)
+
+    def test_weeks_not_materialized(self) -> None:
+        """Test that weeks that were not materialized cannot be accessed."""
+        plan = BookReadingPlan(start_date=datetime(2000, 1, 1),
+                               end_date=datetime(2000, 3, 31),
+                               start_page=1,
+                               end_page=300,
+                               materialize_weeks=False)
+        with self.assertRaises(RuntimeError):
+            plan.weeks  # pylint: disable=W0104
+
+        self.assertEqual(len(list(plan.iter_weeks())), 14)
+
+
+class TestGetReadingForDate(unittest.TestCase):
+    """Test class for get_reading_for_date."""
+
+    def test_matches_book_reading_plan(self) -> None:
+        """Test that every date agrees with the fully built plan."""
+        start_page = 5
+        end_page = 90
+        for start_offset in range(7):
+            start_date = datetime(2000, 1, 3) + timedelta(days=start_offset)
+            end_date = start_date + timedelta(days=40)
+            for num_times_to_read in range(1, 8):
+                plan = BookReadingPlan(start_date=start_date,
+                                       end_date=end_date,
+                                       start_page=start_page,
+                                       end_page=end_page,
+                                       num_times_to_read=num_times_to_read,
+                                       blackout_dates=[end_date])
+                expected_days = {}
+                for week_number, week in enumerate(plan.weeks, 1):
+                    for day in week.days:
+                        expected_days[day.start_date] = (
+                            day.start_page, day.end_page, week_number)
+                for i in range(41):
+                    date = start_date + timedelta(days=i)
+                    reading = get_reading_for_date(
+                        date, start_date, end_date, start_page, end_page,
+                        num_times_to_read, blackout_dates=[end_date])
+                    expected_result = expected_days.get(
+                        date, (None, None, reading.week_number))
+                    self.assertEqual((reading.start_page,
+                                      reading.end_page,
+                                      reading.week_number),
+                                     expected_result)
+
+    def test_pages_remaining(self) -> None:
+        """Test for the pages_remaining attribute."""
+        start_date = datetime(2000, 1, 3) # Monday
+        end_date = datetime(2000, 1, 9) # Sunday
+        reading = get_reading_for_date(
+            datetime(2000, 1, 4), start_date, end_date, 1, 40, 5)
+
+        self.assertEqual((reading.start_page, reading.end_page), (11, 20))
+        self.assertEqual(reading.pages_remaining, 20)
+
+    def test_date_outside_of_plan(self) -> None:
+        """Test that dates outside of the plan throw an error."""
+        start_date = datetime(2000, 1, 3)
+        end_date = datetime(2000, 1, 9)
+        with self.assertRaises(ValueError):
+            get_reading_for_date(
+                datetime(2000, 1, 10), start_date, end_date, 1, 40, 5)
+
+    def test_reading_from_calendar(self) -> None:
+        """Test that a prebuilt calendar gives the same readings."""
+        start_date = datetime(2000, 1, 3)
+        end_date = datetime(2000, 12, 31)
+        blackout_dates = [start_date + timedelta(days=i)
+                          for i in range(0, 360, 5)]
+        calendar = ReadingCalendar(start_date, end_date, 4,
+                                   blackout_dates=blackout_dates)
+        for i in range(0, 360, 7):
+            date = start_date + timedelta(days=i)
+            expected_result = get_reading_for_date(
+                date, start_date, end_date, 1, 900, 4,
+                blackout_dates=blackout_dates)
+            reading = get_reading_from_calendar(date, calendar, 1, 900)
+            self.assertEqual((reading.start_page, reading.end_page,
+                              reading.week_number, reading.pages_remaining),
+                             (expected_result.start_page,
+                              expected_result.end_page,
+                              expected_result.week_number,
+                              expected_result.pages_remaining))
+
+    def test_date_range_stops_at_end_date(self) -> None:
+        """Test that the range variant leaves out dates past the plan."""
+        start_date = datetime(2000, 1, 3)
+        end_date = datetime(2000, 1, 9)
+        readings = get_readings_for_date_range(
+            datetime(2000, 1, 8), 5, start_date, end_date, 1, 40, 5)
+
+        self.assertEqual([r.start_date for r in readings],
+                         [datetime(2000, 1, 8), datetime(2000, 1, 9)])
+
+    def test_date_range_starts_at_start_date(self) -> None:
+        """Test that the range variant leaves out dates before the plan."""
+        start_date = datetime(2000, 1, 3)
+        end_date = datetime(2000, 1, 9)
+        readings = get_readings_for_date_range(
+            datetime(1999, 12, 31), 5, start_date, end_date, 1, 40, 5)
+        self.assertEqual([r.start_date for r in readings],
+                         [datetime(2000, 1, 3), datetime(2000, 1, 4)])
+
+        readings = get_readings_for_date_range(
+            datetime(1999, 12, 1), 5, start_date, end_date, 1, 40, 5)
+        self.assertEqual(readings, [])
+
+        readings = get_readings_for_date_range(
+            datetime(1999, 12, 31), 10 ** 20, start_date, end_date, 1, 40, 5)
+        self.assertEqual(len(readings), 7)
+
+    def test_date_range_without_days(self) -> None:
+        """Test that the range variant requires at least one day."""
+        for num_days in [0, -1]:
+            with self.assertRaises(ValueError):
+                get_readings_for_date_range(
+                    datetime(2000, 1, 3), num_days, datetime(2000, 1, 3),
+                    datetime(2000, 1, 9), 1, 40, 5)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,9 +1,17 @@
 """Unit tests for plans.py.
 """
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+import os
+import tempfile
 import unittest
+from zipfile import ZIP_DEFLATED, ZIP_STORED, ZipFile
 
 
-from src.reading_plan.writers import num_to_word
+from src.reading_plan.plans import BookReadingPlan
+from src.reading_plan.writers import (BookReadingPlanWriter,
+                                      ReadingPlanWriter, num_to_word,
+                                      write_plans)
 
 class TestReadingPlanWriter(unittest.TestCase):
     """Test class for ReadingPlanWriter."""
@@ -17,18 +25,201 @@ class TestReadingPlanWriter(unittest.TestCase):
         self.assertEqual(num_to_word(27), 'Twenty-Seven')
         self.assertEqual(num_to_word(999), 'Nine Hundred Ninety-Nine')
 
-    def test_num_to_word_above_999_and_below_0(self) -> None:
-        """Test that numbers above 999 throw an error.
+    def test_num_to_word_above_999(self) -> None:
+        """Test that numbers above 999 be converted into words.
+        """
+
+        self.assertEqual(num_to_word(1000), 'One Thousand')
+        self.assertEqual(num_to_word(5218),
+                         'Five Thousand Two Hundred Eighteen')
+        self.assertEqual(num_to_word(2000017), 'Two Million Seventeen')
+        self.assertEqual(num_to_word(10**15), 'One Thousand Trillion')
+
+    def test_num_to_word_below_1(self) -> None:
+        """Test that numbers below 1 throw an error.
         """
 
-        # Validate that 999 does not throw error.
-        num_to_word(999)
-        # Validate that 1000 breaks fine.
-        with self.assertRaises(NotImplementedError):
-            num_to_word(1000)
         # Validate that 0 breaks fine.
         with self.assertRaises(NotImplementedError):
             num_to_word(0)
+        with self.assertRaises(NotImplementedError):
+            num_to_word(-1)
+
+
+class TestBookReadingPlanWriter(unittest.TestCase):
+    """Test class for BookReadingPlanWriter."""
+
+    def test_write_excel_compression(self) -> None:
+        """Test that xlsx files are packaged with the compression mode."""
+        plan = BookReadingPlan(start_date=datetime(2000, 1, 1),
+                               end_date=datetime(2000, 3, 31),
+                               start_page=1,
+                               end_page=300)
+        writer = BookReadingPlanWriter(plan)
+        with tempfile.TemporaryDirectory() as outdir:
+            sizes = []
+            for compression, compress_type in [('stored', ZIP_STORED),
+                                               ('fast', ZIP_DEFLATED),
+                                               ('default', ZIP_DEFLATED),
+                                               ('smallest', ZIP_DEFLATED)]:
+                outfile = writer.write_excel(outdir, compression=compression)
+                with ZipFile(outfile) as xlsx_file:
+                    self.assertIsNone(xlsx_file.testzip())
+                    self.assertEqual(
+                        {zipinfo.compress_type
+                         for zipinfo in xlsx_file.infolist()},
+                        {compress_type})
+                self.assertEqual(os.listdir(outdir),
+                                 [os.path.basename(outfile)])
+                sizes.append(os.path.getsize(outfile))
+                os.remove(outfile)
+
+            # Each mode is smaller than the one before it.
+            self.assertEqual(sizes, sorted(sizes, reverse=True))
+            self.assertEqual(len(set(sizes)), len(sizes))
+
+            with self.assertRaises(ValueError):
+                writer.write_excel(outdir, compression='bogus')
+
+    def test_write_csv_weeks_not_materialized(self) -> None:
+        """Test that plans write the same with or without stored weeks."""
+        plan_args = dict(start_date=datetime(2000, 1, 1),
+                         end_date=datetime(2030, 12, 31),
+                         start_page=1,
+                         end_page=20000)
+        with tempfile.TemporaryDirectory() as outdir:
+            for format_outfile in [True, False]:
+                outfiles = []
+                for materialize_weeks in [True, False]:
+                    plan = BookReadingPlan(materialize_weeks=materialize_weeks,
+                                           **plan_args)
+                    outfile = BookReadingPlanWriter(plan).write_csv(
+                        outdir, format_outfile=format_outfile)
+                    with open(outfile) as f:
+                        outfiles.append(f.read())
+                self.assertEqual(outfiles[0], outfiles[1])
+                self.assertIn('___ One Thousand Six Hundred Nineteen.',
+                              outfiles[0])
+
+    def test_write_csv_fixed_outfile(self) -> None:
+        """Test that plans written outside of /tmp use OUT_FILENAME."""
+        plan = BookReadingPlan(start_date=datetime(2000, 1, 1),
+                               end_date=datetime(2000, 3, 31),
+                               start_page=1,
+                               end_page=300)
+        writer = BookReadingPlanWriter(plan)
+        with tempfile.TemporaryDirectory() as outdir:
+            for _ in range(2):
+                outfile = writer.write_csv(outdir)
+            self.assertEqual(outfile, os.path.join(outdir, 'reading-plan.csv'))
+            self.assertEqual(os.listdir(outdir), ['reading-plan.csv'])
+
+    @unittest.skipUnless(os.path.isdir('/proc/self/fd'),
+                         'Open files are counted with /procfs.')
+    def test_write_failure_releases_files(self) -> None:
+        """Test that failed writes close and remove what they wrote."""
+        class FailingBookReadingPlan(BookReadingPlan):
+            """A plan that fails after its first week."""
+            def iter_weeks(self):
+                yield next(super(FailingBookReadingPlan, self).iter_weeks())
+                raise ValueError('Failed to generate a week.')
+
+        plan = FailingBookReadingPlan(start_date=datetime(2000, 1, 1),
+                                      end_date=datetime(2000, 3, 31),
+                                      start_page=1,
+                                      end_page=300)
+        writer = BookReadingPlanWriter(plan)
+        num_open_files = len(os.listdir('/proc/self/fd'))
+        with tempfile.TemporaryDirectory() as outdir:
+            for format_outfile in [True, False]:
+                with self.assertRaises(ValueError):
+                    writer.write_csv(outdir, format_outfile=format_outfile)
+                with self.assertRaises(ValueError):
+                    writer.write_excel(outdir, format_outfile=format_outfile)
+            self.assertEqual(os.listdir(outdir), [])
+        self.assertEqual(len(os.listdir('/proc/self/fd')), num_open_files)
+
+    def test_write_failure_without_abort(self) -> None:
+        """Test that writers without an abort() still raise the real error."""
+        class TextWeekLongWriter(ReadingPlanWriter):
+            """A writer that keeps no files open, so does not override abort."""
+            def write_header(self, header: str):
+                raise ValueError('Failed to write a header.')
+
+            def open(self):
+                self.outfile += '.txt'
+                with open(self.outfile, 'w'):
+                    pass
+
+        plan = BookReadingPlan(start_date=datetime(2000, 1, 1),
+                               end_date=datetime(2000, 3, 31),
+                               start_page=1,
+                               end_page=300)
+        writer = BookReadingPlanWriter(plan)
+        with tempfile.TemporaryDirectory() as outdir:
+            with self.assertRaisesRegex(ValueError, 'Failed to write'):
+                writer._write(TextWeekLongWriter, outdir)
+            self.assertEqual(os.listdir(outdir), [])
+
+
+class TestWritePlans(unittest.TestCase):
+    """Test class for write_plans."""
+
+    @staticmethod
+    def make_plans(num_plans: int):
+        return [BookReadingPlan(start_date=datetime(2000, 1, 1),
+                                end_date=(datetime(2000, 1, 1) +
+                                          timedelta(days=30 * i)),
+                                start_page=1,
+                                end_page=100 * (i + 1),
+                                num_times_to_read=i % 7 + 1,
+                                name='Plan %d' % i,
+                                materialize_weeks=bool(i % 2))
+                for i in range(num_plans)]
+
+    @staticmethod
+    def read_outfile(outfile: str) -> bytes:
+        """Reads a plan, leaving out xlsx metadata such as creation times."""
+        if outfile.endswith('.xlsx'):
+            with ZipFile(outfile) as xlsx_file:
+                return b''.join(xlsx_file.read(name)
+                                for name in sorted(xlsx_file.namelist())
+                                if not name.startswith('docProps/'))
+        with open(outfile, 'rb') as f:
+            return f.read()
+
+    def test_write_plans_under_contention(self) -> None:
+        """Test that parallel writes match sequential writes."""
+        plans = self.make_plans(24)
+        with tempfile.TemporaryDirectory() as outdir:
+            for file_type in ['excel', 'csv']:
+                for format_outfile in [True, False]:
+                    expected_result = [
+                        self.read_outfile(outfile)
+                        for outfile in write_plans(plans, outdir, file_type,
+                                                   format_outfile,
+                                                   max_workers=1)]
+                    outfiles = write_plans(plans * 4, outdir, file_type,
+                                           format_outfile, max_workers=16)
+
+                    self.assertEqual(len(set(outfiles)), len(plans) * 4)
+                    self.assertEqual(
+                        [self.read_outfile(outfile) for outfile in outfiles],
+                        expected_result * 4)
+
+    def test_write_plans_process_pool(self) -> None:
+        """Test that plans can be written on a process pool."""
+        plans = self.make_plans(4)
+        with tempfile.TemporaryDirectory() as outdir:
+            expected_result = [self.read_outfile(outfile)
+                               for outfile in write_plans(plans, outdir)]
+            outfiles = write_plans(plans, outdir,
+                                   executor_class=ProcessPoolExecutor,
+                                   max_workers=2)
+
+            self.assertEqual(
+                [self.read_outfile(outfile) for outfile in outfiles],
+                expected_result)
 
 
 if __name__ == '__main__':